@@ -1,33 +1,56 @@
 ﻿"""Email helpers for sending menu summaries."""
 from __future__ import annotations
 
+import contextlib
+import functools
+import io
 import os
+import queue
 import smtplib
-from dataclasses import dataclass, field
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 import time
-from dotenv import load_dotenv
-load_dotenv()
-from supabase import create_client
 
 PERIOD_KEYS = ("breakfast", "lunch", "dinner")
+SUBSCRIBER_PAGE_SIZE = 500
 
-SUPABASE_URL = os.environ["SUPABASE_URL"]
-BASE_URL = os.environ["BASE_URL"]
-SUPABASE_SERVICE_ROLE_KEY = os.environ["SUPABASE_SERVICE_ROLE_KEY"]
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+_supabase = None
 
-@dataclass
+# Unsubscribe footer injected into each subscriber's copy; only {url} varies.
+_FOOTER_TEMPLATE = """
+            <tr>
+            <td style="padding:10px;background:#1B1A19;border-top:1px solid #6B5E4B;text-align:center;">
+            <p style="margin:0;font-family:Helvetica,Arial,sans-serif;font-size:12px;line-height:18px;color:#D9D4C7;">
+                You're receiving this because you subscribed to the SFU Dining menu newsletter.
+            </p>
+            <p style="margin:0;margin-top:6px;font-family:Helvetica,Arial,sans-serif;font-size:12px;line-height:18px;">
+                <a href="{url}" style="color:#D7B47E;text-decoration:underline;">
+                Unsubscribe
+                </a>
+            </p>
+            </td>
+            </tr>
+            """
+_FOOTER_PREFIX, _FOOTER_SUFFIX = _FOOTER_TEMPLATE.split("{url}")
+
+# In-process copy of email_format rows keyed by date; filled on read and write.
+_HTML_CACHE: dict[str, str] = {}
+
+@dataclass(frozen=True)
 class EmailSettings:
     host: str
     port: int = 587
     sender: str = ""
-    recipients: List[str] = field(default_factory=list)
+    recipients: Tuple[str, ...] = ()
     username: Optional[str] = None
     password: Optional[str] = None
     use_tls: bool = True
+    send_interval: float = 0.0
+    max_connections: int = 4
 
 
 def _split_list(value: Optional[str]) -> List[str]:
@@ -35,13 +58,31 @@ def _split_list(value: Optional[str]) -> List[str]:
         return []
     return [item.strip() for item in value.split(",") if item.strip()]
 
+def _get_supabase():
+    """Return the shared Supabase client, creating it on first use."""
+    global _supabase
+    if _supabase is None:
+        from supabase import create_client
+
+        url = os.environ.get("SUPABASE_URL")
+        key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+        if not url or not key:
+            raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set.")
+        _supabase = create_client(url, key)
+    return _supabase
+
 def store_daily_html(date: str, html: str) -> None:
-    supabase.table("email_format").upsert({"date": date, "html": html}).execute()
+    _get_supabase().table("email_format").upsert({"date": date, "html": html}).execute()
+    _HTML_CACHE[date] = html
 
 def load_cached_email_html(date: str) -> Optional[str]:
     """Return cached HTML content for a given date."""
+    cached = _HTML_CACHE.get(date)
+    if cached is not None:
+        return cached
+
     res = (
-        supabase.table("email_format")
+        _get_supabase().table("email_format")
         .select("html")
         .eq("date", date)
         .limit(1)
@@ -53,18 +94,26 @@ def load_cached_email_html(date: str) -> Optional[str]:
     html_value = rows[0].get("html")
     if not html_value:
         return None
+    _HTML_CACHE[date] = html_value
     return html_value
 
+@functools.lru_cache(maxsize=1)
 def load_email_settings() -> EmailSettings:
-    """Load SMTP settings from environment variables."""
+    """Load SMTP settings from environment variables.
+
+    The result is cached for the life of the process; settings are frozen so
+    callers cannot mutate the shared instance.
+    """
     settings = EmailSettings(
         host=os.environ.get("DININGBOT_SMTP_HOST", ""),
         port=int(os.environ.get("DININGBOT_SMTP_PORT", "587")),
         sender=os.environ.get("DININGBOT_EMAIL_SENDER", ""),
-        recipients=_split_list(os.environ.get("DININGBOT_EMAIL_RECIPIENTS")),
+        recipients=tuple(_split_list(os.environ.get("DININGBOT_EMAIL_RECIPIENTS"))),
         username=os.environ.get("DININGBOT_SMTP_USER"),
         password=os.environ.get("DININGBOT_SMTP_PASSWORD"),
         use_tls=os.environ.get("DININGBOT_SMTP_USE_TLS", "true").lower() != "false",
+        send_interval=float(os.environ.get("DININGBOT_SMTP_SEND_INTERVAL", "0") or 0),
+        max_connections=int(os.environ.get("DININGBOT_SMTP_MAX_CONNECTIONS", "4") or 4),
     )
 
     if not settings.host:
@@ -77,68 +126,135 @@ def load_email_settings() -> EmailSettings:
 def build_plain_text(subject: str, periods: dict[str, dine_api.Period]) -> str:  # type: ignore[attr-defined]
     """Generate a plaintext companion for the email."""
 
-    lines = [subject, ""]
+    buf = io.StringIO()
+    buf.write(subject)
+    buf.write("\n\n")
     for key in PERIOD_KEYS:
         period = periods.get(key)
         if not period:
             continue
-        lines.append(period.name or key.title())
+        buf.write(period.name or key.title())
+        buf.write("\n")
         for category in period.categories:
             if not category.items:
                 continue
-            item_names = ", ".join(item.name for item in category.items if item.name)
+            item_names = ", ".join(filter(None, [item.name for item in category.items]))
             if item_names:
-                label = category.name or "Misc"
-                lines.append(f"  {label}: {item_names}")
-        lines.append("")
-    return "\n".join(lines).strip()
-
-def send_email_helper(settings: EmailSettings, subject: str, html_body: str, text_body: str) -> None:
-    """Send an email with HTML + plain-text parts."""
-
-    # fetch active subscribers
-    res = supabase.table("subscribers").select("email, token").eq("active", True).execute()
-    rows = res.data or []
+                buf.write(f"  {category.name or 'Misc'}: {item_names}\n")
+        buf.write("\n")
+    return buf.getvalue().strip()
 
-    with smtplib.SMTP(settings.host, settings.port, timeout=20) as client:
+def _open_smtp(settings: EmailSettings) -> smtplib.SMTP:
+    """Open an SMTP connection, upgrading to TLS and logging in as configured."""
+    client = smtplib.SMTP(settings.host, settings.port, timeout=20)
+    try:
         if settings.use_tls:
             client.starttls()
         if settings.username and settings.password:
             client.login(settings.username, settings.password)
+    except Exception:
+        client.close()
+        raise
+    return client
 
-        for row in rows:
-            rcpt = row["email"]
-            token = row["token"]
+def _iter_subscriber_pages(page_size: int = SUBSCRIBER_PAGE_SIZE) -> Iterator[list[dict]]:
+    """Yield active subscribers in pages of at most ``page_size`` rows.
 
-            unsubscribe_url = f"{BASE_URL}/unsubscribe?token={token}"
+    Pages are keyed on the last email seen rather than an offset, so rows added
+    or deactivated mid-send cannot shift later pages into duplicates or gaps.
+    """
+    last_email: Optional[str] = None
+    while True:
+        query = _get_supabase().table("subscribers").select("email, token").eq("active", True)
+        if last_email is not None:
+            query = query.gt("email", last_email)
+        res = query.order("email").limit(page_size).execute()
+        rows = res.data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        last_email = rows[-1]["email"]
 
-            footer_html = f"""
-            <tr>
-            <td style="padding:10px;background:#1B1A19;border-top:1px solid #6B5E4B;text-align:center;">
-            <p style="margin:0;font-family:Helvetica,Arial,sans-serif;font-size:12px;line-height:18px;color:#D9D4C7;">
-                You're receiving this because you subscribed to the SFU Dining menu newsletter.
-            </p>
-            <p style="margin:0;margin-top:6px;font-family:Helvetica,Arial,sans-serif;font-size:12px;line-height:18px;">
-                <a href="{unsubscribe_url}" style="color:#D7B47E;text-decoration:underline;">
-                Unsubscribe
-                </a>
-            </p>
-            </td>
-            </tr>
-            """
+def send_email_helper(settings: EmailSettings, subject: str, html_body: str, text_body: str) -> None:
+    """Send an email with HTML + plain-text parts."""
+
+    base_url = os.environ.get("BASE_URL")
+    if not base_url:
+        raise RuntimeError("BASE_URL must be set.")
+
+    # the footer goes ahead of the first closing table tag; split once so each
+    # recipient only costs a concatenation rather than a scan of the whole body
+    prefix, anchor, suffix = html_body.partition("</table>")
+    html_head = f"{prefix}{_FOOTER_PREFIX}{base_url}/unsubscribe?token="
+    html_tail = f"{_FOOTER_SUFFIX}{anchor}{suffix}"
+
+    # the plain-text part never changes, so encode it once and share it; it is
+    # only read while serializing
+    plain_part = MIMEText(text_body, "plain", "utf-8")
+
+    # long-lived workers drain a bounded queue that the page iterator fills, so
+    # each worker logs in once for the whole send and the next page is fetched
+    # while earlier rows are still going out
+    rows_queue: queue.Queue[Optional[dict]] = queue.Queue(maxsize=SUBSCRIBER_PAGE_SIZE)
+    failed = threading.Event()
+    workers = max(1, settings.max_connections)
+
+    def _deliver() -> None:
+        # each worker owns its SMTP connection and message; neither is thread-safe
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = f"SFU Dining Menu <{settings.sender}>"
+        message["To"] = ""
 
-            html_final = html_body.replace("</table>", footer_html + "</table>", 1)
+        error: Optional[Exception] = None
+        with contextlib.ExitStack() as stack:
+            client: Optional[smtplib.SMTP] = None
+            last_sent: Optional[float] = None
+            for row in iter(rows_queue.get, None):
+                # after a failure keep draining so the producer never blocks
+                if failed.is_set():
+                    continue
+                try:
+                    if client is None:
+                        # opened on the first row so idle workers never log in
+                        client = stack.enter_context(_open_smtp(settings))
 
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"SFU Dining Menu <{settings.sender}>"
-            message["To"] = rcpt
+                    rcpt = row["email"]
+                    token = row["token"]
 
-            message.attach(MIMEText(text_body, "plain", "utf-8"))
-            message.attach(MIMEText(html_final, "html", "utf-8"))
+                    html_final = f"{html_head}{token}{html_tail}" if anchor else html_body
 
-            client.sendmail(settings.sender, [rcpt], message.as_string())
-            time.sleep(1)
+                    # build a fresh HTML part per recipient: set_payload on a reused part
+                    # keeps its base64 header without re-encoding the new body
+                    message.replace_header("To", rcpt)
+                    message.set_payload([plain_part, MIMEText(html_final, "html", "utf-8")])
+
+                    if settings.send_interval > 0 and last_sent is not None:
+                        remaining = settings.send_interval - (time.monotonic() - last_sent)
+                        if remaining > 0:
+                            time.sleep(remaining)
+                    client.sendmail(settings.sender, [rcpt], message.as_bytes())
+                    last_sent = time.monotonic()
+                except Exception as exc:
+                    error = exc
+                    failed.set()
+        if error is not None:
+            raise error
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_deliver) for _ in range(workers)]
+        try:
+            for rows in _iter_subscriber_pages():
+                if failed.is_set():
+                    break
+                for row in rows:
+                    rows_queue.put(row)
+        finally:
+            for _ in futures:
+                rows_queue.put(None)
+        for future in as_completed(futures):
+            future.result()
 
 def send_email_to_one(recipient: str, html_body: str, date: str) -> None:
     """Send cached HTML content to a single recipient."""
@@ -158,12 +274,8 @@ def send_email_to_one(recipient: str, html_body: str, date: str) -> None:
     message.attach(MIMEText(text_body, "plain", "utf-8"))
     message.attach(MIMEText(html_body, "html", "utf-8"))
 
-    with smtplib.SMTP(settings.host, settings.port, timeout=20) as client:
-        if settings.use_tls:
-            client.starttls()
-        if settings.username and settings.password:
-            client.login(settings.username, settings.password)
-        client.sendmail(settings.sender, [recipient], message.as_string())
+    with _open_smtp(settings) as client:
+        client.sendmail(settings.sender, [recipient], message.as_bytes())
 
 def send_email(date: str, html_output: str, periods: dict[str, dine_api.Period]) -> None:  # type: ignore[attr-defined]
     """Load email settings and dispatch the menu email."""
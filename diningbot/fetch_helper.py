@@ -5,9 +5,14 @@ from __future__ import annotations
 import datetime as _dt
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
-import requests
+import httpx
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 _logger = logging.getLogger(__name__)
 
@@ -15,25 +20,39 @@ BASE_URL = "https://api.dineoncampus.ca/v1"
 DEFAULT_LOCATION_ID = "63fd054f92d6b41e84b6c30e"
 PERIOD_KEYS = ("breakfast", "lunch", "dinner")
 
+# Shared client so the menu lookup and the parallel period fetches reuse one
+# connection (multiplexed over HTTP/2 when the server offers it) instead of
+# paying a TLS handshake per request.
+_CLIENT = httpx.Client(
+    http2=True,
+    headers={
+        "User-Agent": "DiningBot/0.2",
+        "Accept": "application/json, text/plain, */*",
+    },
+    timeout=20.0,
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+)
+
 
 class ApiError(RuntimeError):
     pass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MenuItem:
     name: str
     description: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Category:
     id: Optional[str]
     name: str
     items: List[MenuItem]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Period:
     id: Optional[str]
     name: str
@@ -41,12 +60,37 @@ class Period:
     categories: List[Category]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Menu:
     date: str
     periods: List[Period]
 
 
+def _decode_json(resp: httpx.Response) -> Dict[str, Any]:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
+
+def _get_json(url: str, params: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+    """GET ``url`` on the shared client and return the decoded success payload."""
+    _logger.info("GET %s params=%s", url, params)
+    try:
+        resp = _CLIENT.get(url, params=params, timeout=timeout)
+    except httpx.HTTPError as exc:
+        raise ApiError(f"Failed request to {url}") from exc
+
+    ct = resp.headers.get("Content-Type", "")
+    if resp.status_code != 200 or "application/json" not in ct:
+        raise ApiError(f"Unexpected response {resp.status_code} {ct}: {resp.text[:200]}")
+
+    data = _decode_json(resp)
+    if data.get("status") != "success":
+        raise ApiError(f"API error: {data}")
+    return data
+
+
 def _ensure_list(value: Any) -> List[Any]:
     if value is None:
         return []
@@ -55,6 +99,22 @@ def _ensure_list(value: Any) -> List[Any]:
     return [value]
 
 
+def _parse_categories(value: Any) -> List[Category]:
+    """Build categories and their items, skipping empty entries."""
+    categories: List[Category] = []
+    for c in _ensure_list(value):
+        if not c:
+            continue
+        items: List[MenuItem] = []
+        for it in _ensure_list(c.get("items")):
+            if not it:
+                continue
+            iname = it.get("name") or it.get("item") or ""
+            items.append(MenuItem(name=iname, description=it.get("description")))
+        categories.append(Category(id=c.get("id"), name=c.get("name", ""), items=items))
+    return categories
+
+
 def fetch_menu(location_id: str, *, date: Optional[str] = None, platform: int = 0, timeout: int = 20) -> Dict[str, Any]:
     """Fetch raw menu JSON for a given location and date.
 
@@ -67,52 +127,32 @@ def fetch_menu(location_id: str, *, date: Optional[str] = None, platform: int =
         date = _dt.date.today().isoformat()
 
     url = f"{BASE_URL}/location/{location_id}/periods"
-    params = {"platform": platform, "date": date}
-    headers = {
-        "User-Agent": "DiningBot/0.2",
-        "Accept": "application/json, text/plain, */*",
-    }
-    _logger.info("GET %s params=%s", url, params)
-    try:
-        resp = requests.get(url, params=params, headers=headers, timeout=timeout)
-    except requests.RequestException as exc:
-        raise ApiError(f"Failed request to {url}") from exc
+    return _get_json(url, {"platform": platform, "date": date}, timeout)
 
-    ct = resp.headers.get("Content-Type", "")
-    if resp.status_code != 200 or "application/json" not in ct:
-        raise ApiError(f"Unexpected response {resp.status_code} {ct}: {resp.text[:200]}")
-
-    data = resp.json()
-    if data.get("status") != "success":
-        raise ApiError(f"API error: {data}")
-    return data
 
+def parse_menu(data: Dict[str, Any], *, keep_ids: Optional[Set[str]] = None) -> Menu:
+    """Convert raw JSON into typed dataclasses with tolerant shape handling.
 
-def parse_menu(data: Dict[str, Any]) -> Menu:
-    """Convert raw JSON into typed dataclasses with tolerant shape handling."""
+    - keep_ids: when given, only periods with these ids are parsed
+    """
     menu = data.get("menu") or {}
     date = menu.get("date", "")
     periods_raw = _ensure_list(menu.get("periods"))
     periods: List[Period] = []
     for p in periods_raw:
-        pid = (p or {}).get("id")
-        name = (p or {}).get("name", "")
-        order = int((p or {}).get("sort_order", 0) or 0)
-        categories_raw = _ensure_list((p or {}).get("categories"))
-        categories: List[Category] = []
-        for c in categories_raw:
-            cid = (c or {}).get("id")
-            cname = (c or {}).get("name", "")
-            items_raw = _ensure_list((c or {}).get("items"))
-            items: List[MenuItem] = []
-            for it in items_raw:
-                if not it:
-                    continue
-                iname = (it or {}).get("name") or (it or {}).get("item") or ""
-                idesc = (it or {}).get("description")
-                items.append(MenuItem(name=iname, description=idesc))
-            categories.append(Category(id=cid, name=cname, items=items))
-        periods.append(Period(id=pid, name=name, sort_order=order, categories=categories))
+        if not p:
+            continue
+        pid = p.get("id")
+        if keep_ids is not None and pid not in keep_ids:
+            continue
+        periods.append(
+            Period(
+                id=pid,
+                name=p.get("name", ""),
+                sort_order=int(p.get("sort_order", 0) or 0),
+                categories=_parse_categories(p.get("categories")),
+            )
+        )
     periods.sort(key=lambda x: x.sort_order)
     return Menu(date=date, periods=periods)
 
@@ -126,25 +166,7 @@ def fetch_period(location_id: str, period_id: str, *, date: Optional[str] = None
         date = _dt.date.today().isoformat()
 
     url = f"{BASE_URL}/location/{location_id}/periods/{period_id}"
-    params = {"platform": platform, "date": date}
-    headers = {
-        "User-Agent": "DiningBot/0.2",
-        "Accept": "application/json, text/plain, */*",
-    }
-    _logger.info("GET %s params=%s", url, params)
-    try:
-        resp = requests.get(url, params=params, headers=headers, timeout=timeout)
-    except requests.RequestException as exc:
-        raise ApiError(f"Failed request to {url}") from exc
-
-    ct = resp.headers.get("Content-Type", "")
-    if resp.status_code != 200 or "application/json" not in ct:
-        raise ApiError(f"Unexpected response {resp.status_code} {ct}: {resp.text[:200]}")
-
-    data = resp.json()
-    if data.get("status") != "success":
-        raise ApiError(f"API error: {data}")
-    return data
+    return _get_json(url, {"platform": platform, "date": date}, timeout)
 
 
 def parse_period(data: Dict[str, Any]) -> Period:
@@ -165,37 +187,17 @@ def parse_period(data: Dict[str, Any]) -> Period:
     pid = period_obj.get("id")
     name = period_obj.get("name", "")
     order = int((period_obj.get("sort_order", 0) or 0))
-    categories_raw = _ensure_list(period_obj.get("categories"))
-    categories: List[Category] = []
-    for c in categories_raw:
-        if not c:
-            continue
-        cid = c.get("id")
-        cname = c.get("name", "")
-        items_raw = _ensure_list(c.get("items"))
-        items: List[MenuItem] = []
-        for it in items_raw:
-            if not it:
-                continue
-            iname = (it or {}).get("name") or (it or {}).get("item") or ""
-            idesc = (it or {}).get("description")
-            items.append(MenuItem(name=iname, description=idesc))
-        categories.append(Category(id=cid, name=cname, items=items))
+    categories = _parse_categories(period_obj.get("categories"))
     return Period(id=pid, name=name, sort_order=order, categories=categories)
 
 def _normalize_period_name(name: str) -> str:
     return "".join(ch.lower() for ch in name if ch.isalnum())
 
 
-def resolve_period_ids(date: str) -> Dict[str, str]:
-    """Resolve dynamic period IDs by matching names from the daily menu."""
+def resolve_period_ids(date: str, menu_data: Dict[str, Any]) -> Dict[str, str]:
+    """Resolve dynamic period IDs by matching names in the fetched daily menu."""
 
     matches: Dict[str, str] = {}
-    try:
-        menu_data = fetch_menu(DEFAULT_LOCATION_ID, date=date, platform=0)
-    except ApiError as exc:
-        _logger.error("Failed to fetch menu for %s: %s", date, exc)
-        raise RuntimeError("Unable to fetch menu data for period resolution") from exc
 
     if isinstance(menu_data, dict):
         # raw periods list often contains the daily ids even when categories are empty
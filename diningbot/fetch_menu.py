@@ -15,26 +15,42 @@ _logger = logging.getLogger(__name__)
 def fetch_daily_menu(date: str) -> dict[str, dine_api.Period]:  # type: ignore[attr-defined]
     """Fetch and parse each dining period for the given date."""
 
-    period_ids = dine_api.resolve_period_ids(date)
-     
+    try:
+        menu_data = dine_api.fetch_menu(DEFAULT_LOCATION_ID, date=date, platform=0)
+    except dine_api.ApiError as exc:  # type: ignore[attr-defined]
+        raise RuntimeError(f"API error retrieving menu: {exc}") from exc
+
+    period_ids = dine_api.resolve_period_ids(date, menu_data)
+
     if not period_ids:
         raise RuntimeError("No period ids resolved")
 
-    parsed_periods: dict[str, dine_api.Period] = {}  # type: ignore[attr-defined]
+    # the menu response already carries full categories for some periods
+    # (often only the active one); reuse those and fetch the rest individually
+    loaded = {
+        period.id: period
+        for period in dine_api.parse_menu(menu_data, keep_ids=set(period_ids.values())).periods
+        if period.id and period.categories
+    }
+    parsed_periods: dict[str, dine_api.Period] = {  # type: ignore[attr-defined]
+        key: loaded[pid] for key, pid in period_ids.items() if pid in loaded
+    }
+    pending = {key: pid for key, pid in period_ids.items() if key not in parsed_periods}
 
     def _fetch(key: str, period_id: str) -> tuple[str, dict]:
         data = dine_api.fetch_period(DEFAULT_LOCATION_ID, period_id, date=date, platform=0)
         return key, data
 
-    with ThreadPoolExecutor(max_workers=len(period_ids)) as executor:
-        futures = {executor.submit(_fetch, key, pid): key for key, pid in period_ids.items()}
-        for future in as_completed(futures):
-            key = futures[future]
-            try:
-                _, data = future.result()
-            except dine_api.ApiError as exc:  # type: ignore[attr-defined]
-                raise RuntimeError(f"API error retrieving {key}: {exc}") from exc
-            parsed_periods[key] = dine_api.parse_period(data)
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {executor.submit(_fetch, key, pid): key for key, pid in pending.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    _, data = future.result()
+                except dine_api.ApiError as exc:  # type: ignore[attr-defined]
+                    raise RuntimeError(f"API error retrieving {key}: {exc}") from exc
+                parsed_periods[key] = dine_api.parse_period(data)
 
     ordered_periods: dict[str, dine_api.Period] = {}  # type: ignore[attr-defined]
     for key in PERIOD_KEYS:
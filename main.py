@@ -62,7 +62,11 @@ def _run_one_off(email: str) -> int:
     pacific = zoneinfo.ZoneInfo("America/Los_Angeles")
     date = _dt.datetime.now(pacific).date().isoformat()
 
-    html_output = load_cached_email_html(date)
+    try:
+        html_output = load_cached_email_html(date)
+    except RuntimeError as exc:
+        _logger.error("Failed to load cached HTML for %s: %s", date, exc)
+        return 1
     if not html_output:
         _logger.info("No cached HTML found for %s; skipping one-off send.", date)
         return 0